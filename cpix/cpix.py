@@ -70,26 +70,29 @@ class CPIX(CPIXComparableBase):
         else:
             raise TypeError("periods should be a PeriodList")
 
+    def root_attributes(self):
+        """Returns attributes of the root CPIX element"""
+        return {"{{{xsi}}}schemaLocation".format(
+            xsi=XSI): "urn:dashif:org:cpix cpix.xsd"}
+
+    def child_elements(self):
+        """
+        Yields XML elements of the non-empty lists in document order, one at a
+        time so they can also be serialized incrementally
+        """
+        for cpix_list, list_type in ((self.content_keys, ContentKeyList),
+                                     (self.drm_systems, DRMSystemList),
+                                     (self.usage_rules, UsageRuleList),
+                                     (self.periods, PeriodList)):
+            if (cpix_list is not None and
+                    isinstance(cpix_list, list_type) and
+                    len(cpix_list) > 0):
+                yield cpix_list.element()
+
     def element(self):
-        el = etree.Element("CPIX", nsmap=NSMAP)
-        el.set("{{{xsi}}}schemaLocation".format(
-            xsi=XSI), "urn:dashif:org:cpix cpix.xsd")
-        if (self.content_keys is not None and
-                isinstance(self.content_keys, ContentKeyList) and
-                len(self.content_keys) > 0):
-            el.append(self.content_keys.element())
-        if (self.drm_systems is not None and
-                isinstance(self.drm_systems, DRMSystemList) and
-                len(self.drm_systems) > 0):
-            el.append(self.drm_systems.element())
-        if (self.usage_rules is not None and
-                isinstance(self.usage_rules, UsageRuleList) and
-                len(self.usage_rules) > 0):
-            el.append(self.usage_rules.element())
-        if (self.periods is not None and
-                isinstance(self.periods, PeriodList) and
-                len(self.periods) > 0):
-            el.append(self.periods.element())
+        el = etree.Element("CPIX", self.root_attributes(), nsmap=NSMAP)
+        for child in self.child_elements():
+            el.append(child)
         return el
 
     @staticmethod
@@ -1,7 +1,8 @@
 """
 Functions for manipulating Playready DRM
 """
-from base64 import b16decode, b16encode, b64decode, b64encode
+from base64 import b16encode, b64decode, b64encode
+from binascii import a2b_hex
 import uuid
 from Crypto.Hash import SHA256
 from Crypto.Cipher import AES
@@ -88,7 +89,7 @@ def checksum(kid, cek):
         kid = uuid.UUID(kid)
     elif isinstance(kid, bytes):
         kid = uuid.UUID(str(kid, "ASCII"))
-    cipher = AES.new(b16decode(cek), AES.MODE_ECB)
+    cipher = AES.new(a2b_hex(cek), AES.MODE_ECB)
     ciphertext = cipher.encrypt(kid.bytes_le)
 
     return b64encode(ciphertext[:8])
@@ -82,15 +82,37 @@ python \
     --playready.la_url https://test.playready.microsoft.com/service/rightsmanager.asmx \
     --stdout 
 
+
+The same documents can be built without the command line, e.g. to generate
+many in one process:
+
+    from cpix_gen import build_cpix
+
+    cpix_xml = build_cpix(
+        ["E82F184C3AAA57B4ACE8606B5E3FEBAD:C2FAF66E2852CC4C4A751F0A2A941FDB"],
+        widevine={},
+        playready={"la_url": "https://test.playready.microsoft.com/..."},
+        presets=[("E82F184C3AAA57B4ACE8606B5E3FEBAD", "video_sd")])
+
 """
 import argparse
+import functools
 import logging
-import cpix
-from cpix.drm import playready, widevine
-from base64 import b16decode, b16encode, b64decode, b64encode
+import os
+import re
+import sys
+from base64 import b64encode
+from binascii import b2a_hex
 from uuid import UUID
 
 
+__all__ = [
+    "parse_keys", "parse_keys_and_ceks",
+    "parse_filter_params", "parse_filters",
+    "build_drm_systems", "build_usage_rules", "build_document", "serialize",
+    "build_cpix", "write_file", "write_stream", "main"]
+
+
 class SmartFormatter(argparse.HelpFormatter):
     def _split_lines(self, text, width):
         if text.startswith('R|'):
@@ -102,44 +124,373 @@ class SmartFormatter(argparse.HelpFormatter):
 logger = logging.getLogger()
 
 
-PRESET_USAGE_RULES = [
-    "audio", "video", "video_sd", "video_hd", "video_uhd1", "videouhd2"]
+# preset usage rule names and the cpix usage rule class each one maps to
+# (class names rather than classes as cpix is imported lazily)
+PRESET_USAGE_RULES = {
+    "audio": "AudioUsageRule",
+    "video": "VideoUsageRule",
+    "video_sd": "SDVideoUsageRule",
+    "video_hd": "HDVideoUsageRule",
+    "video_uhd1": "UHD1VideoUsageRule",
+    "video_uhd2": "UHD2VideoUsageRule"}
+
+
+def parse_bool(value):
+    """Parse true/false usage rule filter values"""
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise ValueError("{} is not a boolean".format(value))
+
+
+# custom usage rule filter types, each mapped to its cpix filter class name
+# and the allowed parameters with the function used to convert their values
+CUSTOM_FILTERS = {
+    "audio": ("AudioFilter", {
+        "min_channels": int,
+        "max_channels": int}),
+    "video": ("VideoFilter", {
+        "min_pixels": int,
+        "max_pixels": int,
+        "hdr": parse_bool,
+        "wcg": parse_bool,
+        "min_fps": int,
+        "max_fps": int}),
+    "bitrate": ("BitrateFilter", {
+        "min_bitrate": int,
+        "max_bitrate": int})}
+
+# filter_type:filter_parameter=value, followed by a comma or the end
+FILTER_PATTERN = re.compile(r"([a-z]+):([a-z_]+)=([^,]+)(?:,|$)")
+
+# usage rules often refer to the same key ID several times
+parse_uuid = functools.lru_cache(maxsize=256)(UUID)
+
+# KID:CEK, both as 32 hex digits
+KEY_PATTERN = re.compile(r"([0-9A-Fa-f]{32}):([0-9A-Fa-f]{32})")
+
+
+def _match_keys(keys):
+    """Match every KID:CEK string, raising on the first malformed one"""
+    matches = [KEY_PATTERN.fullmatch(key) for key in keys]
+
+    for key, match in zip(keys, matches):
+        if match is None:
+            raise ValueError(
+                "key must be KEY_ID:CONTENT_KEY, both 128-bit hex values "
+                "(got {})".format(key))
+    return matches
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_keys_cached(keys):
+    """
+    Parse KID:CEK strings into (key ID, base64 CEK, raw CEK) tuples
+
+    Only immutable values are cached, ContentKeys are built per call as
+    callers may modify them
+    """
+    # check every key before decoding any of them
+    matches = _match_keys(keys)
+
+    parsed_keys = []
+
+    for match in matches:
+        kid, cek = match.groups()
+        raw_cek = bytes.fromhex(cek)
+        parsed_keys.append((UUID(kid), b64encode(raw_cek), raw_cek))
+
+    if len({kid for kid, _, _ in parsed_keys}) != len(parsed_keys):
+        raise ValueError("Duplicate key ID in keys.")
+    return tuple(parsed_keys)
 
 
 def parse_keys(keys):
-    parsed_keys = cpix.ContentKeyList()
+    """
+    Parse KID:CEK strings into a ContentKeyList
+
+    Parsed keys are cached, so regenerating a document for the same set of
+    keys skips decoding them again
+    """
+    return parse_keys_and_ceks(keys)[0]
+
+
+def parse_keys_and_ceks(keys):
+    """
+    Parse KID:CEK strings once into both a ContentKeyList and a dict of key
+    ID to raw content key bytes, as used by the build functions
+    """
+    import cpix
+
+    parsed_keys = _parse_keys_cached(tuple(keys))
+    content_keys = cpix.ContentKeyList(
+        [cpix.ContentKey(kid=kid, cek=cek) for kid, cek, _ in parsed_keys])
+    return content_keys, {kid: raw_cek for kid, _, raw_cek in parsed_keys}
+
+
+@functools.lru_cache(maxsize=256)
+def _widevine_pssh(key_ids, provider, content_id, version):
+    from cpix.drm import widevine
+
+    return widevine.generate_pssh(
+        key_ids=list(key_ids),
+        provider=provider,
+        content_id=content_id,
+        version=version
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _playready_pssh(keys, url, algorithm, version):
+    from cpix.drm import playready
+
+    return playready.generate_pssh(
+        keys=[{"key_id": kid, "key": cek} for kid, cek in keys],
+        url=url,
+        algorithm=algorithm,
+        version=version
+    )
+
 
-    for key in keys:
+def parse_filter_params(filters):
+    """
+    Parse custom usage rule filters (comma separated
+    filter_type:filter_parameter=value) into a dict of filter type to
+    filter keyword arguments
+    """
+    parsed_filters = {}
+    end = 0
+
+    for match in FILTER_PATTERN.finditer(filters):
+        # each filter must directly follow the previous one
+        if match.start() != end:
+            break
+        end = match.end()
+        filter_type, param, value = match.groups()
+        if filter_type not in CUSTOM_FILTERS:
+            raise ValueError(
+                "Invalid filter type in usage rule: {}".format(filter_type))
+        params = CUSTOM_FILTERS[filter_type][1]
+        if param not in params:
+            raise ValueError(
+                "Invalid {} filter parameter in usage rule: {}".format(
+                    filter_type, param))
         try:
-            kid, cek = key.split(":")
+            parsed_filters.setdefault(filter_type, {})[param] = \
+                params[param](value)
         except ValueError:
-            raise Exception("key must be KEY_ID:CONTENT_KEY (missing :)")
+            raise ValueError(
+                "Invalid value for {}:{} in usage rule: {}".format(
+                    filter_type, param, value))
 
-        if len(kid) != 32:
-            raise Exception("key ID must be 128-bit")
-        if len(cek) != 32:
-            raise Exception("cek must be 128-bit")
+    # a separating comma must be followed by another filter
+    if end == 0 or end != len(filters) or filters.endswith(","):
+        raise ValueError(
+            "Invalid usage rule, format is type:parameter=value (comma "
+            "separated): {}".format(filters))
 
-        parsed_keys.append(
-            cpix.ContentKey(kid=kid, cek=b64encode(b16decode(cek))))
-    return parsed_keys
+    return parsed_filters
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="make complex cpix documents simple",
-        formatter_class=SmartFormatter)
-    # key(s)
-    key_group = parser.add_argument_group("Keys")
-    key_group.add_argument(
-        "--key",
-        action="append",
-        dest="keys",
-        help="one or more keys as KID:CEK",
-        metavar="KID:CEK",
-        required=True
+def parse_filters(filters):
+    """
+    Parse custom usage rule filters into a list of cpix filters
+    """
+    import cpix
+
+    parsed_filters = parse_filter_params(filters)
+
+    return [getattr(cpix, class_name)(**parsed_filters[filter_type])
+            for filter_type, (class_name, _) in CUSTOM_FILTERS.items()
+            if filter_type in parsed_filters]
+
+
+def build_drm_systems(content_keys, raw_ceks, widevine=None,
+                      playready=None):
+    """
+    Build DRM systems for a ContentKeyList, raw_ceks is a dict of key ID to
+    raw content key bytes (see parse_keys_and_ceks)
+
+    widevine and playready are dicts of options for each DRM system, a
+    system is only added if its dict is given:
+        widevine: provider, content_id, pssh_version (default: 1)
+        playready: la_url (required), algorithm (default: AESCTR),
+            pssh_version (default: 1)
+
+    Returns a DRMSystemList, or None if neither system is given
+    """
+    if widevine is None and playready is None:
+        return None
+
+    import cpix
+
+    kids = tuple(key.kid for key in content_keys)
+    drm_systems = cpix.DRMSystemList()
+
+    if widevine is not None:
+        pssh = _widevine_pssh(
+            key_ids=kids,
+            provider=widevine.get("provider"),
+            content_id=widevine.get("content_id"),
+            version=widevine.get("pssh_version", 1)
+        )
+        pssh_b64 = b64encode(pssh)
+
+        for kid in kids:
+            drm_systems.append(
+                cpix.DRMSystem(
+                    kid=kid,
+                    system_id=cpix.WIDEVINE_SYSTEM_ID,
+                    pssh=pssh_b64
+                )
+            )
+
+    if playready is not None:
+        if playready.get("la_url") is None:
+            raise ValueError("playready requires la_url")
+
+        # (key ID, hex CEK) pairs, a tuple so the PSSH cache can hash it
+        playready_keys = tuple(
+            (kid, b2a_hex(raw_ceks[kid])) for kid in kids)
+        pssh = _playready_pssh(
+            keys=playready_keys,
+            url=playready["la_url"],
+            algorithm=playready.get("algorithm", "AESCTR"),
+            version=playready.get("pssh_version", 1)
+        )
+        pssh_b64 = b64encode(pssh)
+
+        for kid in kids:
+            drm_systems.append(
+                cpix.DRMSystem(
+                    kid=kid,
+                    system_id=cpix.PLAYREADY_SYSTEM_ID,
+                    pssh=pssh_b64
+                )
+            )
+
+    return drm_systems
+
+
+def build_usage_rules(content_keys, presets=None, customs=None):
+    """
+    Build usage rules for a ContentKeyList
+
+    presets is a list of (KID, preset name) pairs and customs a list of
+    (KID, filters) pairs, filters as described for parse_filter_params
+
+    Returns a UsageRuleList, or None if there are no rules
+    """
+    if not presets and not customs:
+        return None
+
+    import cpix
+
+    kid_set = {key.kid for key in content_keys}
+    usage_rules = cpix.UsageRuleList()
+
+    def rule_kid(kid, rule_type):
+        try:
+            kid = parse_uuid(kid)
+        except ValueError:
+            kid = None
+        if kid not in kid_set:
+            raise ValueError(
+                "Invalid key ID in {} usage rule.".format(rule_type))
+        return kid
+
+    for kid, preset in presets or []:
+        kid = rule_kid(kid, "preset")
+        if preset not in PRESET_USAGE_RULES:
+            raise ValueError("Invalid preset rule. Allowed values are: "
+                             "{}".format(", ".join(PRESET_USAGE_RULES)))
+        usage_rule_class = getattr(cpix, PRESET_USAGE_RULES[preset])
+        usage_rules.append(usage_rule_class(kid))
+
+    for kid, filters in customs or []:
+        usage_rules.append(
+            cpix.UsageRule(rule_kid(kid, "custom"), parse_filters(filters)))
+
+    return usage_rules
+
+
+def build_document(content_keys, drm_systems=None, usage_rules=None):
+    """
+    Build CPIX document for a ContentKeyList with optional DRMSystemList and
+    UsageRuleList
+    """
+    import cpix
+
+    logger.debug(repr(content_keys))
+
+    return cpix.CPIX(
+        content_keys=content_keys,
+        drm_systems=drm_systems,
+        usage_rules=usage_rules
     )
-    # widevine opts
+
+
+def serialize(cpix_doc):
+    """Serialize CPIX document to pretty printed UTF-8 XML"""
+    return cpix_doc.pretty_print(xml_declaration=True, encoding="UTF-8")
+
+
+def build_cpix(keys, widevine=None, playready=None, presets=None,
+               customs=None):
+    """
+    Build complete CPIX XML for KID:CEK strings, see build_drm_systems and
+    build_usage_rules for the remaining arguments
+
+    Keys and PSSH boxes are cached, so this can be called repeatedly (e.g.
+    for a batch of assets) without going through the command line. Raises
+    ValueError on invalid input
+    """
+    content_keys, raw_ceks = parse_keys_and_ceks(keys)
+
+    return serialize(build_document(
+        content_keys,
+        build_drm_systems(content_keys, raw_ceks, widevine, playready),
+        build_usage_rules(content_keys, presets, customs)))
+
+
+def write_file(filename, data):
+    """
+    Write bytes straight to a file descriptor, the document is already one
+    buffer so going through a buffered file object only adds a copy
+    """
+    # O_BINARY (Windows only) stops newlines being translated to \r\n
+    flags = (os.O_WRONLY | os.O_CREAT | os.O_TRUNC |
+             getattr(os, "O_BINARY", 0))
+    fd = os.open(filename, flags, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def write_stream(cpix_doc, f):
+    """
+    Write CPIX document to a file object one list element at a time, so the
+    complete serialized document is never held in memory
+    """
+    from lxml import etree
+    import cpix
+
+    with etree.xmlfile(f, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element("CPIX", cpix_doc.root_attributes(),
+                        nsmap=cpix.NSMAP):
+            xf.write("\n")
+            for child in cpix_doc.child_elements():
+                xf.write(child, pretty_print=True)
+
+
+def _register_widevine(parser):
+    """Add widevine options to parser"""
     widevine_group = parser.add_argument_group("Widevine")
     widevine_group.add_argument(
         "--widevine",
@@ -171,7 +522,10 @@ def main():
         default=1,
         type=int
     )
-    # playready opts
+
+
+def _register_playready(parser):
+    """Add playready options to parser"""
     playready_group = parser.add_argument_group("PlayReady")
     playready_group.add_argument(
         "--playready",
@@ -205,7 +559,10 @@ def main():
         default=1,
         type=int
     )
-    # custom usage rules
+
+
+def _register_usage_rules(parser):
+    """Add custom and preset usage rule options to parser"""
     usage_rule_group = parser.add_argument_group("Usage rules")
     usage_rule_group.add_argument(
         "--usage_rule",
@@ -226,9 +583,53 @@ def main():
         nargs=2,
         metavar=("KID", "USAGE_RULE_PRESET"),
         help="R|use preset usage rule \n"
-             "(audio, video, video_sd, video_hd, video_uhd1, video_uhd2)",
+             "({})".format(", ".join(PRESET_USAGE_RULES)),
         required=False
     )
+
+
+# option prefixes which trigger registration of the matching option group
+DEFERRED_OPTIONS = [
+    ("--widevine", _register_widevine),
+    ("--playready", _register_playready),
+    ("--usage_rule", _register_usage_rules)]
+
+
+def _validate_args(args, parser):
+    """
+    Check option combinations and keys up front, so they are rejected before
+    cpix is imported
+    """
+    # check conditionally required options are set
+    if args.playready and args.playready_la_url is None:
+        parser.error(
+            "When setting --playready must also set --playready.la_url")
+
+    if args.output_filename is None and not args.stdout:
+        parser.error("one of the arguments -o/--output --stdout is required")
+
+    # key parsing needs no cpix and is cached for the build step, usage rules
+    # are checked while building them
+    try:
+        _parse_keys_cached(tuple(args.keys))
+    except ValueError as e:
+        parser.error(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="make complex cpix documents simple",
+        formatter_class=SmartFormatter)
+    # key(s)
+    key_group = parser.add_argument_group("Keys")
+    key_group.add_argument(
+        "--key",
+        action="append",
+        dest="keys",
+        help="one or more keys as KID:CEK",
+        metavar="KID:CEK",
+        required=True
+    )
     # generic opts
     output_group = parser.add_argument_group("Output")
     output_group.add_argument(
@@ -244,6 +645,12 @@ def main():
         dest="stdout",
         help="Output CPIX to stdout rather than file"
     )
+    output_group.add_argument(
+        "--stream",
+        action="store_true",
+        dest="stream",
+        help="Serialize CPIX incrementally rather than in one buffer"
+    )
     parser.add_argument(
         "--log_level",
         action="store",
@@ -253,173 +660,77 @@ def main():
         default="WARN"
     )
 
-    args = parser.parse_args()
-
-    logger.setLevel(args.log_level)
-    ch = logging.StreamHandler()
-    ch.setLevel(args.log_level)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    parser.set_defaults(
+        widevine=False,
+        playready=False,
+        custom_usage_rules=None,
+        preset_usage_rules=None)
+
+    # only register the drm and usage rule options when they are used (or
+    # help is requested), most invocations only need a few of them
+    argv = sys.argv[1:]
+    show_help = "-h" in argv or "--help" in argv
+    if not show_help:
+        _, argv_remaining = parser.parse_known_args(argv)
+    for prefix, register in DEFERRED_OPTIONS:
+        if show_help or any(arg.startswith(prefix) for arg in argv_remaining):
+            register(parser)
+
+    args = parser.parse_args(argv)
+
+    # warnings reach stderr without any configuration, only set up logging
+    # for other levels; basicConfig does nothing if already configured
+    if args.log_level.upper() not in ("WARN", "WARNING"):
+        logging.basicConfig(
+            level=args.log_level.upper(),
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
     logger.debug(args)
 
-    # check conditionally required options are set
-    if args.playready and args.playready_la_url is None:
-        parser.error(
-            "When setting --playready must also set --playready.la_url")
-
-    if args.output_filename is None and not args.stdout:
-        parser.error("one of the arguments -o/--output --stdout is required")
-
-    # parse keys
-    try:
-        keys = parse_keys(args.keys)
-    except Exception as e:
-        parser.error(e)
-
-    logger.debug(repr(keys))
-
-    # parse drm systems
-    drm_systems = cpix.DRMSystemList()
+    _validate_args(args, parser)
 
+    # cpix and the drm modules are only imported from here on, once the
+    # arguments are known to be valid
+    widevine = None
     if args.widevine:
-        pssh = widevine.generate_pssh(
-            key_ids=[key.kid for key in keys],
-            provider=args.widevine_provider,
-            content_id=args.widevine_content_id,
-            version=args.widevine_pssh_version
-        )
-
-        for key in keys:
-            drm_systems.append(
-                cpix.DRMSystem(
-                    kid=key.kid,
-                    system_id=cpix.WIDEVINE_SYSTEM_ID,
-                    pssh=b64encode(pssh)
-                )
-            )
+        widevine = {
+            "provider": args.widevine_provider,
+            "content_id": args.widevine_content_id,
+            "pssh_version": args.widevine_pssh_version}
 
+    playready = None
     if args.playready:
-        pssh = playready.generate_pssh(
-            keys=[{"key_id": key.kid, "key": b16encode(
-                b64decode(key.cek))} for key in keys],
-            url=args.playready_la_url,
-            algorithm=args.playready_algorithm,
-            version=args.playready_pssh_version
-        )
-
-        for key in keys:
-            drm_systems.append(
-                cpix.DRMSystem(
-                    kid=key.kid,
-                    system_id=cpix.PLAYREADY_SYSTEM_ID,
-                    pssh=b64encode(pssh)
-                )
-            )
+        playready = {
+            "la_url": args.playready_la_url,
+            "algorithm": args.playready_algorithm,
+            "pssh_version": args.playready_pssh_version}
 
-    # usage rules
-    usage_rules = cpix.UsageRuleList()
+    try:
+        content_keys, raw_ceks = parse_keys_and_ceks(args.keys)
+        cpix_doc = build_document(
+            content_keys,
+            build_drm_systems(content_keys, raw_ceks, widevine, playready),
+            build_usage_rules(
+                content_keys,
+                args.preset_usage_rules,
+                args.custom_usage_rules))
+    except ValueError as e:
+        parser.error(e)
 
-    # presets
-    if args.preset_usage_rules:
-        for rule in args.preset_usage_rules:
-            try:
-                kid = UUID(rule[0])
-            except ValueError:
-                parser.error("Invalid key ID in preset usage rule.")
-            if kid not in [key.kid for key in keys]:
-                parser.error("Invalid key ID in preset usage rule.")
-
-            if rule[1] == "audio":
-                usage_rules.append(cpix.AudioUsageRule(kid))
-            elif rule[1] == "video":
-                usage_rules.append(cpix.VideoUsageRule(kid))
-            elif rule[1] == "video_sd":
-                usage_rules.append(cpix.SDVideoUsageRule(kid))
-            elif rule[1] == "video_hd":
-                usage_rules.append(cpix.HDVideoUsageRule(kid))
-            elif rule[1] == "video_uhd1":
-                usage_rules.append(cpix.UHD1VideoUsageRule(kid))
-            elif rule[1] == "video_uhd2":
-                usage_rules.append(cpix.UHD2VideoUsageRule(kid))
-            else:
-                parser.error("Invalid preset rule. Allowed values are: audio, "
-                             "video, video_sd, video_hd, video_uhd1, "
-                             "video_uhd2")
-
-    # custom
-    if args.custom_usage_rules:
-        for rule in args.custom_usage_rules:
-            try:
-                kid = UUID(rule[0])
-            except ValueError:
-                parser.error("Invalid key ID in custom usage rule.")
-            if kid not in [key.kid for key in keys]:
-                parser.error("Invalid key ID in custom usage rule.")
-
-            usage_rule = cpix.UsageRule(kid)
-
-            parsed_filters = {}
-            
-            # parse the custom filter options
-            for _filter in rule[1].split(","):
-                filter_type, filter_param = _filter.split(":")
-                fp_type, fp_value = filter_param.split("=")
-
-                if filter_type == "audio":
-                    if "audio" not in parsed_filters:
-                        parsed_filters["audio"] = {}
-                    parsed_filters["audio"][fp_type] = fp_value
-                if filter_type == "video":
-                    if "video" not in parsed_filters:
-                        parsed_filters["video"] = {}
-                    parsed_filters["video"][fp_type] = fp_value
-                if filter_type == "bitrate":
-                    if "bitrate" not in parsed_filters:
-                        parsed_filters["bitrate"] = {}
-                    parsed_filters["bitrate"][fp_type] = fp_value
-
-            # convert parsed filters to proper objects
-            if "audio" in parsed_filters:
-                try:
-                    usage_rule.append(
-                        cpix.AudioFilter(**parsed_filters["audio"]))
-                except TypeError:
-                    parser.error(
-                        "Invalid audio filter parameter in usage rule")
-            if "video" in parsed_filters:
-                try:
-                    usage_rule.append(
-                        cpix.VideoFilter(**parsed_filters["video"]))
-                except TypeError:
-                    parser.error(
-                        "Invalid video filter parameter in usage rule")
-            if "bitrate" in parsed_filters:
-                try:
-                    usage_rule.append(
-                        cpix.BitrateFilter(**parsed_filters["bitrate"]))
-                except TypeError:
-                    parser.error(
-                        "Invalid bitrate filter parameter in usage rule")
-
-            usage_rules.append(usage_rule)
-
-    # create complete CPIX document
-    cpix_doc = cpix.CPIX(
-        content_keys=keys,
-        drm_systems=drm_systems,
-        usage_rules=usage_rules
-    )
+    if args.stream:
+        if args.stdout:
+            write_stream(cpix_doc, sys.stdout.buffer)
+        else:
+            with open(args.output_filename, "wb") as f:
+                write_stream(cpix_doc, f)
+        return
 
-    cpix_xml = cpix_doc.pretty_print(xml_declaration=True, encoding="UTF-8")
+    cpix_xml = serialize(cpix_doc)
 
     if args.stdout:
         print(str(cpix_xml, "utf-8"))
     else:
-        with open(args.output_filename, "wb") as f:
-            f.write(cpix_xml)
+        write_file(args.output_filename, cpix_xml)
 
 
 if (__name__ == "__main__"):
@@ -429,3 +429,22 @@ def test_parse_period():
     assert cpix_doc.periods[0].end == isodate.parse_datetime(
         "2018-08-07T00:00:00Z"
     )
+
+
+def test_cpix_child_elements_skip_empty_lists():
+    cpix_doc = cpix.CPIX(
+        content_keys=cpix.ContentKeyList(
+            cpix.ContentKey(
+                kid="0DC3EC4F-7683-548B-81E7-3C64E582E136",
+                cek="WADwG2qCqkq5TVml+U5PXw==",
+            )
+        )
+    )
+
+    children = [etree.QName(el).localname
+                for el in cpix_doc.child_elements()]
+
+    assert children == ["ContentKeyList"]
+    assert cpix_doc.root_attributes() == {
+        "{http://www.w3.org/2001/XMLSchema-instance}schemaLocation":
+            "urn:dashif:org:cpix cpix.xsd"}
@@ -0,0 +1,177 @@
+import io
+import os
+import sys
+import pytest
+import cpix
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "example")
+sys.path.insert(0, EXAMPLE_DIR)
+
+import cpix_gen  # noqa: E402
+
+
+KEYS = [
+    "0D6B40238DA15E75AF6875C514C59B63:582D6B71611BE04C88E22AAA10441E2C",
+    "E82F184C3AAA57B4ACE8606B5E3FEBAD:C2FAF66E2852CC4C4A751F0A2A941FDB",
+]
+
+
+def test_parse_keys_cached_keys_not_shared():
+    keys = cpix_gen.parse_keys(KEYS)
+    keys[0].common_encryption_scheme = "cbcs"
+
+    keys = cpix_gen.parse_keys(KEYS)
+
+    assert keys[0].common_encryption_scheme == "cenc"
+    assert keys[0] is not cpix_gen.parse_keys(KEYS)[0]
+
+
+def test_write_stream_matches_pretty_print():
+    keys = cpix_gen.parse_keys(KEYS)
+    cpix_doc = cpix.CPIX(
+        content_keys=keys,
+        drm_systems=cpix.DRMSystemList([
+            cpix.DRMSystem(
+                kid=key.kid,
+                system_id=cpix.WIDEVINE_SYSTEM_ID,
+                pssh=b"AAAAInBzc2gAAAAA7e+LqXnWSs6jyCfc1R0h7QAAAAI4AQ==")
+            for key in keys]),
+        usage_rules=cpix.UsageRuleList([
+            cpix.AudioUsageRule(keys[0].kid),
+            cpix.SDVideoUsageRule(keys[1].kid)]))
+
+    f = io.BytesIO()
+    cpix_gen.write_stream(cpix_doc, f)
+
+    streamed = cpix.parse(f.getvalue())
+
+    assert streamed == cpix.parse(cpix_doc.pretty_print())
+    assert len(streamed.content_keys) == 2
+    assert len(streamed.drm_systems) == 2
+    assert len(streamed.usage_rules) == 2
+
+
+def test_parse_filter_params_converts_values():
+    params = cpix_gen.parse_filter_params(
+        "video:min_pixels=0,video:max_pixels=442368,video:hdr=false,"
+        "video:wcg=True,audio:max_channels=2,bitrate:max_bitrate=500000")
+
+    assert params == {
+        "video": {
+            "min_pixels": 0, "max_pixels": 442368, "hdr": False,
+            "wcg": True},
+        "audio": {"max_channels": 2},
+        "bitrate": {"max_bitrate": 500000}}
+
+
+def test_parse_filters_hdr_false():
+    filters = cpix_gen.parse_filters("video:hdr=false,video:wcg=0")
+
+    assert str(filters[0]) == '<VideoFilter hdr="false" wcg="false"/>'
+
+
+def test_parse_filters_order():
+    filters = cpix_gen.parse_filters(
+        "bitrate:max_bitrate=500000,video:max_pixels=442368,"
+        "audio:max_channels=2")
+
+    assert [type(f) for f in filters] == [
+        cpix.AudioFilter, cpix.VideoFilter, cpix.BitrateFilter]
+
+
+@pytest.mark.parametrize("filters", [
+    "video:min_pixels=0,",
+    ",video:min_pixels=0",
+    "video:min_pixels=0,,video:max_pixels=442368",
+    "",
+    "garbage",
+])
+def test_parse_filter_params_malformed(filters):
+    with pytest.raises(ValueError, match="format is type:parameter=value"):
+        cpix_gen.parse_filter_params(filters)
+
+
+@pytest.mark.parametrize("filters, message", [
+    ("colour:min_bits=8", "Invalid filter type"),
+    ("video:max_channels=2", "Invalid video filter parameter"),
+    ("video:max_pixels=abc", "Invalid value for video:max_pixels"),
+    ("video:hdr=maybe", "Invalid value for video:hdr"),
+])
+def test_parse_filter_params_invalid(filters, message):
+    with pytest.raises(ValueError, match=message):
+        cpix_gen.parse_filter_params(filters)
+
+
+PLAYREADY_TEST_URL = (
+    "https://test.playready.microsoft.com/service/rightsmanager.asmx")
+
+
+def run_cli(monkeypatch, tmp_path, *args):
+    output = tmp_path / "out.xml"
+    monkeypatch.setattr(
+        sys, "argv",
+        ["cpix_gen.py"] + [a for key in KEYS for a in ("--key", key)] +
+        list(args) + ["-o", str(output)])
+    cpix_gen.main()
+    return output.read_bytes()
+
+
+def test_build_cpix_matches_cli(monkeypatch, tmp_path):
+    kid = KEYS[1].split(":")[0]
+    cli_xml = run_cli(
+        monkeypatch, tmp_path,
+        "--widevine", "--playready", "--playready.la_url", PLAYREADY_TEST_URL,
+        "--usage_rule_preset", KEYS[0].split(":")[0], "audio",
+        "--usage_rule", kid, "video:max_pixels=442368")
+
+    cpix_xml = cpix_gen.build_cpix(
+        KEYS,
+        widevine={},
+        playready={"la_url": PLAYREADY_TEST_URL},
+        presets=[(KEYS[0].split(":")[0], "audio")],
+        customs=[(kid, "video:max_pixels=442368")])
+
+    assert cpix_xml == cli_xml
+
+
+def test_build_functions_match_cli(monkeypatch, tmp_path):
+    cli_xml = run_cli(
+        monkeypatch, tmp_path,
+        "--widevine", "--usage_rule_preset", KEYS[0].split(":")[0], "video")
+
+    content_keys, raw_ceks = cpix_gen.parse_keys_and_ceks(KEYS)
+    drm_systems = cpix_gen.build_drm_systems(
+        content_keys, raw_ceks, widevine={})
+    usage_rules = cpix_gen.build_usage_rules(
+        content_keys, presets=[(KEYS[0].split(":")[0], "video")])
+    cpix_doc = cpix_gen.build_document(content_keys, drm_systems, usage_rules)
+
+    assert len(drm_systems) == 2
+    assert len(usage_rules) == 1
+    assert cpix_gen.serialize(cpix_doc) == cli_xml
+
+
+def test_build_functions_nothing_to_build():
+    content_keys, raw_ceks = cpix_gen.parse_keys_and_ceks(KEYS)
+
+    assert cpix_gen.build_drm_systems(content_keys, raw_ceks) is None
+    assert cpix_gen.build_usage_rules(content_keys) is None
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"keys": ["bad"]}, "key must be KEY_ID:CONTENT_KEY"),
+    ({"keys": KEYS + KEYS[:1]}, "Duplicate key ID"),
+    ({"keys": KEYS, "playready": {}}, "playready requires la_url"),
+    ({"keys": KEYS, "presets": [(KEYS[0].split(":")[0], "video_8k")]},
+     "Invalid preset rule"),
+    ({"keys": KEYS,
+      "customs": [("087BCFC6F7A55716B8406AA6EBA3369E",
+                   "audio:max_channels=2")]},
+     "Invalid key ID in custom usage rule"),
+    ({"keys": KEYS, "presets": [("not-a-kid", "audio")]},
+     "Invalid key ID in preset usage rule"),
+])
+def test_build_cpix_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        cpix_gen.build_cpix(**kwargs)
@@ -25,6 +25,15 @@ def test_checksum():
     assert checksum == b"Me48z71nuqY="
 
 
+def test_checksum_lowercase_cek():
+    kid = b"8ba94ade-6eb9-449d-b44f-a5beefaf43b0"
+    cek = b"dbfd6922c321c4bb486f4a1c44097ed6"
+
+    checksum = playready.checksum(kid, cek)
+
+    assert checksum == b"Me48z71nuqY="
+
+
 def test_generate_wrmheader():
     keys = [
         {